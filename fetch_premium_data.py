@@ -15,64 +15,153 @@ So we adjust the NAV for forex movement:
 - Premium % = ((Market Price - Adjusted iNAV) / Adjusted iNAV) × 100
 """
 
-import json
+import functools
+import hashlib
+import os
+import tempfile
+import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import sys
 
 
-def fetch_mon100_prices(start_date: str, end_date: str) -> pd.DataFrame:
-    """Fetch MON100.NS daily closing prices from Yahoo Finance."""
-    print(f"Fetching MON100.NS prices from {start_date} to {end_date}...")
+CACHE_DIR = '.cache'
+CACHE_TTL_SECONDS = 24 * 60 * 60
 
-    try:
-        ticker = yf.Ticker("MON100.NS")
-        df = ticker.history(start=start_date, end=end_date, auto_adjust=True)
+# Shared session: keeps connections alive between calls and retries
+# transient gateway errors from mfapi with backoff
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+))
 
-        if df.empty:
-            raise ValueError("No price data returned for MON100.NS")
 
-        df = df[['Close']].copy()
-        df.index = df.index.tz_localize(None).normalize()
-        df.columns = ['price']
+def disk_cache(func):
+    """Cache a fetch function's result on disk for CACHE_TTL_SECONDS."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Key on the call arguments plus today's date so NAVs refresh daily
+        key_parts = [func.__name__, *map(str, args)]
+        key_parts += [f"{k}={v}" for k, v in sorted(kwargs.items())]
+        key_parts.append(datetime.now().strftime('%Y-%m-%d'))
+        key = hashlib.md5(':'.join(key_parts).encode()).hexdigest()
+        path = os.path.join(CACHE_DIR, f"{key}.pkl")
 
-        print(f"  Retrieved {len(df)} price records")
-        return df
+        if os.path.exists(path) and time.time() - os.path.getmtime(path) < CACHE_TTL_SECONDS:
+            try:
+                result = pd.read_pickle(path)
+                print(f"Using cached {func.__name__} result from {path}")
+                return result
+            except Exception as e:
+                print(f"Ignoring unreadable cache file {path}: {e}")
+
+        result = func(*args, **kwargs)
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            prune_cache()
+            # Write to a temp file and swap it in, so concurrent or
+            # interrupted runs never leave a half-written pickle behind
+            fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pd.to_pickle(result, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Ignoring cache write failure for {path}: {e}")
+
+        return result
+
+    return wrapper
+
+
+def prune_cache() -> None:
+    """Delete cache files older than CACHE_TTL_SECONDS."""
+    cutoff = time.time() - CACHE_TTL_SECONDS
+
+    for entry in os.scandir(CACHE_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            continue  # already removed by a concurrent run
+
+
+@disk_cache
+def fetch_yahoo_data(start_date: str, end_date: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Fetch MON100.NS prices and USDINR rates from Yahoo Finance in one batched download."""
+    print(f"Fetching MON100.NS prices and USDINR rates from {start_date} to {end_date}...")
+
+    try:
+        data = yf.download(
+            ['MON100.NS', 'USDINR=X'],
+            start=start_date,
+            end=end_date,
+            auto_adjust=True,
+            threads=True,
+            ignore_tz=True,
+            progress=False
+        )
+
+        if data is None or data.empty:
+            raise ValueError("No data returned from Yahoo Finance")
+
+        # ignore_tz already gives a tz-naive index shared by both tickers,
+        # so it only needs flooring to whole days once
+        closes = data['Close']
+        closes.index = closes.index.floor('D')
+
+        prices_df = extract_close(closes, 'MON100.NS', 'price')
+        forex_df = extract_close(closes, 'USDINR=X', 'usdinr')
+
+        print(f"  Retrieved {len(prices_df)} price records")
+        print(f"  Retrieved {len(forex_df)} forex records")
+        return prices_df, forex_df
 
     except Exception as e:
-        print(f"Error fetching MON100.NS prices: {e}")
+        print(f"Error fetching Yahoo Finance data: {e}")
         raise
 
 
+def extract_close(closes: pd.DataFrame, ticker: str, column: str) -> pd.DataFrame:
+    """Extract one ticker's daily closes from a batched yfinance download."""
+    # Selecting the column as a Series is a view, so dropna is the only copy
+    df = closes[ticker].dropna().to_frame(column)
+
+    if df.empty:
+        raise ValueError(f"No data returned for {ticker}")
+
+    return df
+
+
+@disk_cache
 def fetch_nav_data(scheme_code: int = 114984) -> pd.DataFrame:
     """Fetch NAV data from mfapi.in API."""
     url = f"https://api.mfapi.in/mf/{scheme_code}"
     print(f"Fetching NAV data from {url}...")
 
     try:
-        response = requests.get(url, timeout=30)
+        response = HTTP_SESSION.get(url, timeout=30)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         if 'data' not in data:
             raise ValueError("Invalid API response - 'data' field missing")
 
-        nav_records = []
-        for record in data['data']:
-            try:
-                date = datetime.strptime(record['date'], '%d-%m-%Y')
-                nav = float(record['nav'])
-                nav_records.append({'date': date, 'nav': nav})
-            except (ValueError, KeyError):
-                continue
-
-        df = pd.DataFrame(nav_records)
-        df.set_index('date', inplace=True)
-        df.sort_index(inplace=True)
+        # Parse whole columns at once; unparseable records become NaN/NaT and are dropped
+        df = pd.DataFrame(data['data'], columns=['date', 'nav'])
+        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y', errors='coerce')
+        df['nav'] = pd.to_numeric(df['nav'], errors='coerce')
+        df = df.dropna(subset=['date', 'nav']).set_index('date').sort_index()
 
         print(f"  Retrieved {len(df)} NAV records")
         return df
@@ -82,29 +171,6 @@ def fetch_nav_data(scheme_code: int = 114984) -> pd.DataFrame:
         raise
 
 
-def fetch_usdinr_rates(start_date: str, end_date: str) -> pd.DataFrame:
-    """Fetch USDINR forex rates from Yahoo Finance."""
-    print(f"Fetching USDINR rates from {start_date} to {end_date}...")
-
-    try:
-        ticker = yf.Ticker("USDINR=X")
-        df = ticker.history(start=start_date, end=end_date, auto_adjust=True)
-
-        if df.empty:
-            raise ValueError("No forex data returned for USDINR=X")
-
-        df = df[['Close']].copy()
-        df.index = df.index.tz_localize(None).normalize()
-        df.columns = ['usdinr']
-
-        print(f"  Retrieved {len(df)} forex records")
-        return df
-
-    except Exception as e:
-        print(f"Error fetching USDINR rates: {e}")
-        raise
-
-
 def calculate_premium(
     prices_df: pd.DataFrame,
     nav_df: pd.DataFrame,
@@ -123,59 +189,76 @@ def calculate_premium(
     """
     print("Calculating premium...")
 
-    # Create complete date range and forward-fill forex rates
-    all_dates = pd.date_range(
-        start=min(prices_df.index.min(), nav_df.index.min(), forex_df.index.min()),
-        end=max(prices_df.index.max(), nav_df.index.max(), forex_df.index.max())
+    # Forex lookups below use reindex with ffill, which needs a sorted index
+    # with a single rate per day - keep the last quote of any duplicated date
+    forex_df = forex_df.sort_index(kind='stable')
+    forex_df = forex_df[~forex_df.index.duplicated(keep='last')]
+
+    # Attach the most recent NAV on or before each trading day
+    prices = prices_df.sort_index().rename_axis('date').reset_index()
+    navs = nav_df.sort_index().rename_axis('nav_date').reset_index()
+    # merge_asof requires both keys to share the same datetime resolution
+    navs['nav_date'] = navs['nav_date'].astype(prices['date'].dtype)
+
+    merged = pd.merge_asof(
+        prices,
+        navs,
+        left_on='date',
+        right_on='nav_date',
+        direction='backward'
     )
-    forex_complete = forex_df.reindex(all_dates, method='ffill')
-
-    # Build result dataframe
-    results = []
-
-    for price_date in prices_df.index:
-        price = prices_df.loc[price_date, 'price']
-
-        # Find the most recent NAV on or before this date
-        nav_dates_before = nav_df.index[nav_df.index <= price_date]
-        if len(nav_dates_before) == 0:
-            continue
-
-        nav_date = nav_dates_before[-1]
-        nav = nav_df.loc[nav_date, 'nav']
-
-        # Get forex rates
-        if price_date not in forex_complete.index or nav_date not in forex_complete.index:
-            continue
-
-        usdinr_today = forex_complete.loc[price_date, 'usdinr']
-        usdinr_nav_day = forex_complete.loc[nav_date, 'usdinr']
-
-        if pd.isna(usdinr_today) or pd.isna(usdinr_nav_day) or usdinr_nav_day == 0:
-            continue
-
-        # Calculate adjusted iNAV
-        # If forex went up since NAV date, the underlying is worth more in INR
-        forex_adjustment = usdinr_today / usdinr_nav_day
-        adjusted_inav = nav * forex_adjustment
-
-        # Calculate premium
-        premium = ((price - adjusted_inav) / adjusted_inav) * 100
-
-        results.append({
-            'date': price_date,
+    merged = merged.dropna(subset=['nav_date'])
+
+    # Look up forex rates for both the trading day and the NAV day, carrying
+    # the last known rate forward over days without a quote
+    usdinr = forex_df['usdinr'].reindex(merged['date'], method='ffill').to_numpy(dtype=np.float64)
+    usdinr_nav_day = forex_df['usdinr'].reindex(merged['nav_date'], method='ffill').to_numpy(dtype=np.float64)
+    valid = ~np.isnan(usdinr) & ~np.isnan(usdinr_nav_day) & (usdinr_nav_day != 0)
+
+    price = merged['price'].to_numpy(dtype=np.float64)[valid]
+    nav = merged['nav'].to_numpy(dtype=np.float64)[valid]
+    usdinr = usdinr[valid]
+    usdinr_nav_day = usdinr_nav_day[valid]
+
+    # Calculate adjusted iNAV
+    # If forex went up since NAV date, the underlying is worth more in INR
+    forex_adj = usdinr / usdinr_nav_day
+    adjusted_inav = nav * forex_adj
+
+    # Calculate premium - in place, so only one output array is allocated
+    premium = np.subtract(price, adjusted_inav)
+    premium /= adjusted_inav
+    premium *= 100.0
+
+    result_df = pd.DataFrame(
+        {
             'price': price,
             'nav': nav,
-            'nav_date': nav_date,
-            'usdinr': usdinr_today,
+            'nav_date': merged['nav_date'].to_numpy()[valid],
+            'usdinr': usdinr,
             'usdinr_nav_day': usdinr_nav_day,
-            'forex_adj': forex_adjustment,
+            'forex_adj': forex_adj,
             'adjusted_inav': adjusted_inav,
             'premium': premium
-        })
+        },
+        index=pd.DatetimeIndex(merged['date'].to_numpy()[valid], name='date')
+    )
 
-    result_df = pd.DataFrame(results)
-    result_df.set_index('date', inplace=True)
+    # Downcast the price/NAV/rate columns to float32, rounding the published
+    # ones to their output precision first - rounding after the downcast can
+    # flip values sitting near a decimal boundary. The nearest float32 to an
+    # already-rounded value rounds back to the same decimal in save_to_json.
+    # premium stays unrounded float64: the statistics and the JSON rounding
+    # both read it, and float32 error would flip values near a boundary.
+    result_df = result_df.round({'price': 2, 'nav': 2, 'adjusted_inav': 2, 'usdinr': 4})
+    result_df = result_df.astype({
+        'price': 'float32',
+        'nav': 'float32',
+        'usdinr': 'float32',
+        'usdinr_nav_day': 'float32',
+        'forex_adj': 'float32',
+        'adjusted_inav': 'float32'
+    })
 
     print(f"  Calculated premium for {len(result_df)} trading days")
 
@@ -194,15 +277,26 @@ def calculate_premium(
 
 def calculate_statistics(premiums: pd.Series) -> Dict[str, float]:
     """Calculate statistical measures for the premium series."""
+    # copy=True guarantees a private buffer that np.percentile may reorder
+    arr = premiums.to_numpy(dtype=np.float64, copy=True)
+
+    current = round(arr[-1], 2) if arr.size > 0 else None
+    average = round(arr.mean(), 2)
+    std = round(arr.std(ddof=1), 2)  # sample std, as pandas computes it
+
+    # One percentile call yields min, quartiles and max from a single
+    # partition, done in place on arr since nothing reads it afterwards
+    q = np.percentile(arr, [0, 25, 50, 75, 100], overwrite_input=True)
+
     return {
-        'min': round(premiums.min(), 2),
-        'max': round(premiums.max(), 2),
-        'average': round(premiums.mean(), 2),
-        'median': round(premiums.median(), 2),
-        'p25': round(premiums.quantile(0.25), 2),
-        'p75': round(premiums.quantile(0.75), 2),
-        'std': round(premiums.std(), 2),
-        'current': round(premiums.iloc[-1], 2) if len(premiums) > 0 else None
+        'min': round(q[0], 2),
+        'max': round(q[4], 2),
+        'average': average,
+        'median': round(q[2], 2),
+        'p25': round(q[1], 2),
+        'p75': round(q[3], 2),
+        'std': std,
+        'current': current
     }
 
 
@@ -211,19 +305,37 @@ def save_to_json(df: pd.DataFrame, stats: Dict[str, float], output_path: str) ->
     print(f"\nSaving data to {output_path}...")
 
     output = {
-        'dates': [d.strftime('%Y-%m-%d') for d in df.index],
-        'premiums': [round(p, 2) for p in df['premium'].tolist()],
-        'prices': [round(p, 2) for p in df['price'].tolist()],
-        'navs': [round(n, 2) for n in df['nav'].tolist()],
-        'adjusted_inavs': [round(i, 2) for i in df['adjusted_inav'].tolist()],
-        'usdinr': [round(u, 4) for u in df['usdinr'].tolist()],
+        'dates': df.index.strftime('%Y-%m-%d').tolist(),
+        'premiums': df['premium'].round(2).to_numpy(),
+        'prices': df['price'].round(2).to_numpy(),
+        'navs': df['nav'].round(2).to_numpy(),
+        'adjusted_inavs': df['adjusted_inav'].round(2).to_numpy(),
+        'usdinr': df['usdinr'].round(4).to_numpy(),
         'stats': stats,
         'last_updated': datetime.now().isoformat(),
         'data_points': len(df)
     }
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2)
+    # orjson serializes the NumPy arrays natively, without a tolist() round-trip
+    payload = orjson.dumps(
+        output,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+    )
+
+    with open(output_path, 'wb') as f:
+        f.write(payload)
+
+    print(f"  Saved {len(df)} data points")
+
+
+def save_to_parquet(df: pd.DataFrame, output_path: str) -> None:
+    """Save the premium series as a compact columnar file for Arrow-based consumers."""
+    print(f"Saving data to {output_path}...")
+
+    df[['price', 'nav', 'adjusted_inav', 'usdinr', 'premium']].to_parquet(
+        output_path,
+        compression='zstd'
+    )
 
     print(f"  Saved {len(df)} data points")
 
@@ -247,13 +359,16 @@ def main():
     print()
 
     try:
-        # Fetch all data sources
-        prices_df = fetch_mon100_prices(start_str, end_str)
-        nav_df = fetch_nav_data()
-        forex_df = fetch_usdinr_rates(start_str, end_str)
-
-        # Filter NAV data to our date range
-        nav_df = nav_df[(nav_df.index >= start_date) & (nav_df.index <= end_date)]
+        # Fetch all data sources concurrently - they are independent network calls
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            yahoo_future = executor.submit(fetch_yahoo_data, start_str, end_str)
+            nav_future = executor.submit(fetch_nav_data)
+            prices_df, forex_df = yahoo_future.result()
+            nav_df = nav_future.result()
+
+        # Filter NAV data to our date range - fetch_nav_data returns it sorted,
+        # so a label slice is a binary search rather than two boolean masks
+        nav_df = nav_df.loc[start_date:end_date]
         print(f"  Filtered NAV to {len(nav_df)} records in date range")
         print()
 
@@ -281,8 +396,9 @@ def main():
         print(f"  75th %:   {stats['p75']:.2f}%")
         print(f"  Std Dev:  {stats['std']:.2f}%")
 
-        # Save to JSON
+        # Save to JSON for the dashboard, plus a Parquet copy for other consumers
         save_to_json(result_df, stats, 'premium_data.json')
+        save_to_parquet(result_df, 'premium_data.parquet')
 
         print()
         print("Data fetch complete!")